@@ -1,6 +1,5 @@
 import argparse
 import asyncio
-import csv
 import logging
 import os
 import time
@@ -22,9 +21,8 @@ logger.setLevel(logging.DEBUG)
 
 
 def write_csv(filename, acceleration):
-    with open(filename, "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerows(acceleration)
+    # 16 significant digits round-trip the scaled int16 samples exactly
+    np.savetxt(filename, acceleration, fmt="%.16g", delimiter=",")
 
 
 async def connect_node(transceiver, output_dir, addr):
@@ -42,6 +40,8 @@ async def connect_node(transceiver, output_dir, addr):
                 version.build_version,
             )
 
+            accel = None
+
             with node.reports() as reports:
                 logger.info("Requesting settings from %s", addr)
                 await node.report_settings()
@@ -58,23 +58,21 @@ async def connect_node(transceiver, output_dir, addr):
                             "%s: Snippet report: start_time=%s", addr, msg.start_time
                         )
                         filename = f"snippet_{msg.start_time}.csv"
-                        x = (
-                            np.frombuffer(msg.samples[0], dtype=np.dtype("<h"))
-                            * 16.0
-                            / 32768
-                        )
-                        y = (
-                            np.frombuffer(msg.samples[1], dtype=np.dtype("<h"))
-                            * 16.0
-                            / 32768
-                        )
-                        z = (
-                            np.frombuffer(msg.samples[2], dtype=np.dtype("<h"))
-                            * 16.0
-                            / 32768
+                        # Scale each axis straight into its column of a buffer
+                        # that is reused while the snippet length stays the same
+                        # (the previous write has completed by now).
+                        num_samples = len(msg.samples[0]) // 2
+                        if accel is None or len(accel) != num_samples:
+                            accel = np.empty((num_samples, 3), dtype=np.float32)
+                        for i in range(3):
+                            np.multiply(
+                                np.frombuffer(msg.samples[i], dtype="<i2"),
+                                np.float32(16.0 / 32768),
+                                out=accel[:, i],
+                            )
+                        await asyncio.to_thread(
+                            write_csv, Path(node_dir, filename), accel
                         )
-                        accel = np.array([x, y, z]).T
-                        write_csv(Path(node_dir, filename), accel)
                     elif isinstance(msg, avss.SettingsReport):
                         logger.info("%s: Settings report: %s", addr, msg)
                     else:
@@ -1,8 +1,8 @@
 import asyncio
+import contextlib
 import functools
 import json
 import logging
-import math
 import sys
 import time
 from pathlib import Path
@@ -13,6 +13,7 @@ from bleak.exc import BleakError
 
 import anura.avss as avss
 from anura.avss.bleak_avss_client import BleakAVSSClient
+from anura.avss.client import PROGRAM_MAX_INFLIGHT
 from anura.transceiver.client import TransceiverClient
 from anura.transceiver.models import BluetoothAddrLE
 from anura.transceiver.proxy_avss_client import ProxyAVSSClient
@@ -22,6 +23,39 @@ from .session import SessionFile
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a node to become reachable after rebooting to upgrade.
+REBOOT_TIMEOUT = 60
+
+
+@contextlib.asynccontextmanager
+async def assigned_proxy_client(trx_client, address):
+    """Connect to a node through a transceiver assigned to it.
+
+    The assignment check and the connection are started together so they
+    overlap, rather than paying for one round trip before the other starts.
+    """
+    client = ProxyAVSSClient(trx_client, address)
+    open_task = asyncio.create_task(client.__aenter__())
+
+    try:
+        resp = await trx_client.get_assigned_nodes()
+        if not any(node.address == address for node in resp.nodes):
+            # Opening would wait for the node indefinitely, so don't await it
+            raise click.ClickException(f"Transceiver not assigned to node {address}")
+        await open_task
+    except BaseException:
+        open_task.cancel()
+        await asyncio.wait([open_task])
+        # Only a completed open leaves a connection behind to close
+        if not open_task.cancelled() and open_task.exception() is None:
+            await client.__aexit__(None, None, None)
+        raise
+
+    try:
+        yield client
+    finally:
+        await client.__aexit__(None, None, None)
+
 
 def with_avss_client(f):
     @click.option("--transceiver", help="Hostname, IP address or usb:<serial>")
@@ -45,15 +79,11 @@ def with_avss_client(f):
 
         async def do_proxy_async():
             logger.info(f"Connect to transceiver {transceiver}")
-            async with TransceiverClient(transceiver, transceiver_port) as trx_client:
-                # Check if the transceiver is assigned to the given node
-                resp = await trx_client.get_assigned_nodes()
-                if not any(node.address == address for node in resp.nodes):
-                    click.echo(f"Error: Transceiver not assigned to node {address}")
-                    sys.exit(1)
-
-                async with ProxyAVSSClient(trx_client, address) as client:
-                    return await f(*args, client=client, **kwargs)
+            async with (
+                TransceiverClient(transceiver, transceiver_port) as trx_client,
+                assigned_proxy_client(trx_client, address) as client,
+            ):
+                return await f(*args, client=client, **kwargs)
 
         if transceiver:
             asyncio.run(do_proxy_async())
@@ -80,7 +110,11 @@ def scan():
 
     async def do_async():
         try:
-            async with BleakScanner(on_detection):
+            # Let the Bluetooth stack filter out other devices' advertisements
+            # where it supports it, so the callback mostly sees AVSS nodes.
+            async with BleakScanner(
+                on_detection, service_uuids=[avss.uuids.ServiceUuid]
+            ):
                 await stop_event.wait()
         except BleakError as ex:
             click.echo(f"ERROR: {ex}", err=True)
@@ -97,7 +131,14 @@ def scan():
 @click.option("--address", help="Bluetooth address of AVSS node.", required=True)
 @click.option("--file", metavar="FILE", help="Path to firmware image.")
 @click.option("--confirm-only", is_flag=True, help="Run only the confirm step.")
-def upgrade(transceiver, transceiver_port, address, file, confirm_only):
+@click.option(
+    "--window",
+    type=click.IntRange(min=1),
+    default=PROGRAM_MAX_INFLIGHT,
+    show_default=True,
+    help="Number of program writes kept in flight during the upload.",
+)
+def upgrade(transceiver, transceiver_port, address, file, confirm_only, window):
     """Upgrade node firmware."""
 
     if not confirm_only and not file:
@@ -115,27 +156,42 @@ def upgrade(transceiver, transceiver_port, address, file, confirm_only):
             sys.exit(1)
 
     address = BluetoothAddrLE.parse(address)
+    # The same node is looked up again after it reboots into the new image.
+    ble_address = address.address_str()
+    image_index = 0
+
+    async def transfer_image(client: avss.AVSSClient):
+        await client.prepare_upgrade(image_index, len(binary))
+        with upload_progress(len(binary), "Uploading firmware") as on_progress:
+            await client.program_transfer(
+                binary, progress=on_progress, max_inflight=window
+            )
+        await client.apply_upgrade()
 
     async def do_async():
         try:
-            device = await BleakScanner.find_device_by_address(address.address_str())
-            image_index = 0
+            if confirm_only:
+                # Already rebooted into the new image, see below.
+                device = await BleakScanner.find_device_by_address(ble_address)
+            else:
+                # Only AVSS advertisements need to reach the lookup's filter
+                # callback.
+                device = await BleakScanner.find_device_by_address(
+                    ble_address, service_uuids=[avss.uuids.ServiceUuid]
+                )
 
             if not confirm_only:
                 async with BleakAVSSClient(device) as client:
-                    await client.prepare_upgrade(image_index, len(binary))
-                    with upload_progress(
-                        len(binary), "Uploading firmware"
-                    ) as on_progress:
-                        await client.program_transfer(binary, progress=on_progress)
-                    await client.apply_upgrade()
+                    await transfer_image(client)
 
                 click.echo("Waiting for node to reboot with new firmware image...")
                 # Wait at last 5 seconds to make sure we don't find the device
                 # before it has actually rebooted and started swapping images.
                 await asyncio.sleep(5)
+                # Look the rebooted node up by address alone: the new image or
+                # the bootloader may not advertise the AVSS service UUID.
                 device = await BleakScanner.find_device_by_address(
-                    address.address_str(), timeout=60
+                    ble_address, timeout=60
                 )
 
             async with BleakAVSSClient(device) as client:
@@ -149,41 +205,50 @@ def upgrade(transceiver, transceiver_port, address, file, confirm_only):
         try:
             logger.info(f"Connect to transceiver {transceiver}")
             async with TransceiverClient(transceiver, transceiver_port) as trx_client:
-                # Check if the transceiver is assigned to the given node
-                resp = await trx_client.get_assigned_nodes()
-                if not any(node.address == address for node in resp.nodes):
-                    click.echo(f"Error: Transceiver not assigned to node {address}")
-                    sys.exit(1)
-
-                image_index = 0
-
                 if not confirm_only:
-                    async with ProxyAVSSClient(trx_client, address) as client:
-                        await client.prepare_upgrade(image_index, len(binary))
-                        with upload_progress(
-                            len(binary), "Uploading firmware"
-                        ) as on_progress:
-                            await client.program_transfer(
-                                binary, progress=on_progress
+                    async with assigned_proxy_client(trx_client, address) as client:
+                        await transfer_image(client)
+
+                        click.echo(
+                            "Waiting for node to reboot with new firmware image..."
+                        )
+                        # Reconnect as soon as the node drops the connection to
+                        # reboot; opening the new connection polls until the
+                        # node is available again.
+                        with contextlib.suppress(TimeoutError):
+                            await asyncio.wait_for(
+                                client.wait_for_disconnection(), 30.0
                             )
-                        await client.apply_upgrade()
-
-                    click.echo("Waiting for node to reboot with new firmware image...")
-                    await asyncio.sleep(30.0)
 
-                async with ProxyAVSSClient(trx_client, address) as client:
-                    while True:
-                        try:
-                            version = await client.get_version()
-                            break
-                        except Exception:
-                            await asyncio.sleep(1.0)
-
-                    click.echo(
-                        f"Version: {version.version} (build: {version.build_version})"
-                    )
-                    click.echo("Confirming new image")
-                    await client.confirm_upgrade(image_index)
+                # Opening the connection and the version probe both keep
+                # retrying while the node is away; give up if it doesn't come
+                # back, e.g. because it never rebooted into the new image.
+                reconnect = asyncio.timeout(REBOOT_TIMEOUT)
+                try:
+                    async with (
+                        reconnect,
+                        assigned_proxy_client(trx_client, address) as client,
+                    ):
+                        while True:
+                            try:
+                                version = await client.get_version()
+                                break
+                            except (TimeoutError, ConnectionError, avss.AVSSError):
+                                await asyncio.sleep(1.0)
+                        reconnect.reschedule(None)
+
+                        click.echo(
+                            f"Version: {version.version} "
+                            f"(build: {version.build_version})"
+                        )
+                        click.echo("Confirming new image")
+                        await client.confirm_upgrade(image_index)
+                except TimeoutError:
+                    if reconnect.expired():
+                        raise click.ClickException(
+                            f"Node did not come back within {REBOOT_TIMEOUT} s"
+                        ) from None
+                    raise
 
         except Exception as ex:
             click.echo(f"Error: {ex}", err=True)
@@ -230,10 +295,12 @@ async def throughput(client: avss.AVSSClient, duration: float):
 
         if transfer_info and transfer_info.elapsed_time > 0:
             throughput = transfer_info.num_bytes / transfer_info.elapsed_time / 1000
+            throughput_str = f"{throughput:.2f}"
         else:
-            throughput = "??"
+            throughput_str = "??"
 
-        segment_size = math.ceil(transfer_info.num_bytes / transfer_info.num_segments)
+        # Ceiling division, kept in integers
+        segment_size = -(-transfer_info.num_bytes // transfer_info.num_segments)
 
         click.echo(
             f"Received {transfer_info.num_bytes} B "
@@ -241,7 +308,7 @@ async def throughput(client: avss.AVSSClient, duration: float):
             f"in {transfer_info.elapsed_time:.2f} s"
         )
 
-        click.echo(f"Throughput:   {throughput:.2f} kB/s")
+        click.echo(f"Throughput:   {throughput_str} kB/s")
         click.echo(f"Segment size: {segment_size} B")
 
 
@@ -382,6 +449,7 @@ async def collect_reports(
 
         with SessionFile(output, read_only=False) as f:
             f.update_session_info(time.time_ns())
+            flusher = asyncio.create_task(f.flush_periodically())
 
             try:
                 async for report in reports:
@@ -400,6 +468,10 @@ async def collect_reports(
                     click.echo(f"Received report type '{report_type_str}'")
             except KeyboardInterrupt:
                 click.echo("\nStopping collection...")
+            finally:
+                flusher.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await flusher
 
 
 @avss_group.command()
@@ -478,21 +550,27 @@ async def quick_measurement(
         async def collect_reports():
             with SessionFile(output, read_only=False) as f:
                 f.update_session_info(time.time_ns())
-
-                async for report in reports:
-                    f.insert_avss_report(
-                        received_at=time.time_ns(),
-                        node_id="NODE",
-                        report_type=report.report_type,
-                        payload_cbor=report.payload_cbor,
-                    )
-                    try:
-                        report_type_str = avss.client.ReportType(
-                            report.report_type
-                        ).name
-                    except ValueError:
-                        report_type_str = str(report.report_type)
-                    click.echo(f"Report Type '{report_type_str}' received")
+                flusher = asyncio.create_task(f.flush_periodically())
+
+                try:
+                    async for report in reports:
+                        f.insert_avss_report(
+                            received_at=time.time_ns(),
+                            node_id="NODE",
+                            report_type=report.report_type,
+                            payload_cbor=report.payload_cbor,
+                        )
+                        try:
+                            report_type_str = avss.client.ReportType(
+                                report.report_type
+                            ).name
+                        except ValueError:
+                            report_type_str = str(report.report_type)
+                        click.echo(f"Report Type '{report_type_str}' received")
+                finally:
+                    flusher.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await flusher
 
         try:
             await asyncio.wait_for(collect_reports(), duration)
@@ -18,9 +18,14 @@ def upload_progress(length: int, label: str) -> Iterator[Callable[[int], None]]:
     """
     with click.progressbar(length=length, label=label) as bar:
         sent = 0
+        # Transfers report progress after every small chunk; only redraw the
+        # bar about once per percent.
+        min_step = max(1, length // 100)
 
         def on_progress(total_sent: int) -> None:
             nonlocal sent
+            if total_sent - sent < min_step and total_sent != length:
+                return
             bar.update(total_sent - sent)
             sent = total_sent
 
@@ -1,6 +1,8 @@
+import asyncio
 import logging
 import sqlite3
 import sys
+import time
 from contextlib import closing
 from pathlib import Path
 
@@ -8,6 +10,12 @@ logger = logging.getLogger(__name__)
 
 SCHEMA_VERSION = 1
 
+# Reports are buffered and written in batches; a batch is flushed when it
+# reaches this many rows or when this many seconds have passed since the
+# last flush.
+INSERT_BATCH_SIZE = 64
+INSERT_FLUSH_INTERVAL = 0.5
+
 CREATE_SCHEMA = """
 CREATE TABLE vibreshark_schema (
     version INTEGER
@@ -23,12 +31,19 @@ CREATE TABLE avss_report (
 );
 """
 
+INSERT_AVSS_REPORT = (
+    "INSERT INTO avss_report (received_at, node_id, report_type, payload_cbor)"
+    " VALUES (?, ?, ?, ?)"
+)
+
 
 class SessionFile:
     def __init__(self, path, read_only=True):
         self._path = path
         self._conn: sqlite3.Connection = None
         self._read_only = read_only
+        self._pending: list[tuple] = []
+        self._last_flush = 0.0
 
     def open(self):
         if self._conn:
@@ -49,6 +64,10 @@ class SessionFile:
         file_exists = abs_path.exists()
         self._conn = sqlite3.connect(file_uri, uri=True)
 
+        if not self._read_only:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+
         if file_exists:
             self._check_version()
         else:
@@ -56,6 +75,11 @@ class SessionFile:
 
     def close(self):
         if self._conn:
+            self.flush()
+            if not self._read_only:
+                # Fold the write-ahead log back into the file, so a closed
+                # session is a single file that opens read-only anywhere.
+                self._conn.execute("PRAGMA journal_mode=DELETE")
             self._conn.close()
             self._conn = None
 
@@ -68,15 +92,16 @@ class SessionFile:
 
     def _check_version(self):
         with closing(self._conn.cursor()) as cur:
-            cur.row_factory = sqlite3.Row
             cur.execute("SELECT version FROM vibreshark_schema")
 
             row = cur.fetchone()
 
             if not row:
                 raise RuntimeError("Unrecognized file format")
-            elif row["version"] != SCHEMA_VERSION:
-                raise RuntimeError(f"Unsupported file version: {row.version}")
+
+            (version,) = row
+            if version != SCHEMA_VERSION:
+                raise RuntimeError(f"Unsupported file version: {version}")
 
     def _initialize_schema(self):
         logger.debug("Initializing schema")
@@ -90,12 +115,34 @@ class SessionFile:
     def insert_avss_report(
         self, received_at, node_id, report_type, payload_cbor
     ) -> None:
-        self._conn.execute(
-            "INSERT INTO avss_report (received_at, node_id, report_type, payload_cbor)"
-            " VALUES (?, ?, ?, ?)",
-            [received_at, node_id, report_type, payload_cbor],
-        )
+        self._pending.append((received_at, node_id, report_type, payload_cbor))
+
+        if (
+            len(self._pending) >= INSERT_BATCH_SIZE
+            or time.monotonic() - self._last_flush >= INSERT_FLUSH_INTERVAL
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered reports to the file."""
+        self._last_flush = time.monotonic()
+
+        if not self._pending:
+            return
+
+        self._conn.executemany(INSERT_AVSS_REPORT, self._pending)
         self._conn.commit()
+        self._pending.clear()
+
+    async def flush_periodically(self) -> None:
+        """Flush buffered reports every flush interval until cancelled.
+
+        Run this alongside the insert loop so that reports don't sit
+        uncommitted when no further reports arrive.
+        """
+        while True:
+            await asyncio.sleep(INSERT_FLUSH_INTERVAL)
+            self.flush()
 
     def update_session_info(self, created_at: int) -> None:
         with closing(self._conn.cursor()) as cur:
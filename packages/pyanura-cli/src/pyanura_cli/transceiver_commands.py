@@ -2,6 +2,7 @@ import asyncio
 import functools
 import logging
 import sys
+import threading
 import time
 from pathlib import Path
 
@@ -9,6 +10,7 @@ import click
 import zeroconf
 
 from anura.transceiver.client import TransceiverClient
+from anura.transceiver.exceptions import TransceiverConnectionError
 from anura.transceiver.models import BluetoothAddrLE, ScanNodesReceivedEvent
 from anura.transceiver.proxy_avss_client import ProxyAVSSClient
 from anura.transceiver.transport import USBTransport
@@ -56,8 +58,37 @@ def transceiver_group():
 
 
 @transceiver_group.command()
-def browse():
+@click.option(
+    "--timeout",
+    default=60.0,
+    show_default=True,
+    help="Time (seconds) to browse for transceivers",
+)
+@click.option(
+    "--count",
+    type=click.IntRange(min=1),
+    help="Stop once this many transceivers have been found",
+)
+@click.option(
+    "--idle",
+    default=3.0,
+    show_default=True,
+    help="Once a transceiver has answered over mDNS, stop when no new one has "
+    "been found for this long (seconds), 0 to browse for the full timeout",
+)
+def browse(timeout, count, idle):
     """List transceivers discovered using mDNS and USB"""
+    found = 0
+    done = threading.Event()
+    answered = threading.Event()  # some transceiver has answered over mDNS
+    activity = threading.Event()  # a new one has since answered over mDNS
+
+    def on_found(server):
+        nonlocal found
+        click.echo(server)
+        found += 1
+        if count is not None and found >= count:
+            done.set()
 
     class EchoDistinctListener(zeroconf.ServiceListener):
         def __init__(self):
@@ -66,22 +97,43 @@ def browse():
         def add_service(self, zc: zeroconf.Zeroconf, type_: str, name: str) -> None:
             info = zc.get_service_info(type_, name)
 
+            if info is None:
+                logger.debug(f"No service info for {name}")
+                return
+
             if info.port != 7645:
                 server = f"{info.server}:{info.port}"
             else:
                 server = f"{info.server}"
 
             if server not in self._found_servers:
-                click.echo(server)
                 self._found_servers.add(server)
+                on_found(server)
+                answered.set()
+                activity.set()
 
     for serial in USBTransport.list_devices():
-        print(f"usb:{serial}")
+        on_found(f"usb:{serial}")
+
+    if done.is_set():
+        return
 
     with zeroconf.Zeroconf() as zc:
         listener = EchoDistinctListener()
         zeroconf.ServiceBrowser(zc, "_revibe-anura._tcp.local.", listener)
-        time.sleep(60.0)
+
+        deadline = time.monotonic() + timeout
+        while not done.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Only stop early once mDNS has produced a result, so slow
+            # networks still get the full timeout.
+            idle_stop = idle > 0 and answered.is_set()
+            wait = min(idle, remaining) if idle_stop else remaining
+            if not activity.wait(wait) and idle_stop:
+                break  # nothing new for a while; responders have answered
+            activity.clear()
 
 
 @transceiver_group.command()
@@ -136,8 +188,12 @@ async def get_connected_nodes(client: TransceiverClient):
 async def avss_throughput(client: TransceiverClient, mode: str, duration: int):
     """Measure concurrent AVSS throughput."""
 
-    async def test_throughput(addr):
+    async def test_throughput(addr, ready: asyncio.Barrier | None):
         async with ProxyAVSSClient(client, addr) as node:
+            # Nodes are opened concurrently; start the tests together so they
+            # actually overlap, however long each node took to become available.
+            if ready is not None:
+                await ready.wait()
             with node.reports(parse=False) as reports:
                 if mode == "test":
                     click.echo(f"{addr}: Starting {duration} s throughput test...")
@@ -154,14 +210,15 @@ async def avss_throughput(client: TransceiverClient, mode: str, duration: int):
                         throughput = (
                             transfer_info.num_bytes / transfer_info.elapsed_time / 1000
                         )
+                        throughput_str = f"{throughput:.2f}"
                     else:
-                        throughput = "??"
+                        throughput_str = "??"
 
                     click.echo(
                         f"{addr}: Received {transfer_info.num_bytes} B "
                         f"over {transfer_info.num_segments} segments "
                         f"in {transfer_info.elapsed_time:.2f} s "
-                        f"({throughput:.2f} kB/s)"
+                        f"({throughput_str} kB/s)"
                     )
 
                     if mode == "test":
@@ -175,10 +232,24 @@ async def avss_throughput(client: TransceiverClient, mode: str, duration: int):
         )
         return
 
+    # Only nodes that are connected now take part in the synchronized start.
+    # Opening a node that is offline waits until it shows up, which must not
+    # hold up the others; such nodes start on their own once available.
+    connected_nodes_resp = await client.get_connected_nodes()
+    connected = {node.address for node in connected_nodes_resp.nodes}
+    synchronized = {
+        node.address for node in assigned_nodes_resp.nodes if node.address in connected
+    }
+    ready = asyncio.Barrier(len(synchronized)) if synchronized else None
+
     try:
         async with asyncio.TaskGroup() as tg:
             for node in assigned_nodes_resp.nodes:
-                tg.create_task(test_throughput(node.address))
+                tg.create_task(
+                    test_throughput(
+                        node.address, ready if node.address in synchronized else None
+                    )
+                )
     except ExceptionGroup as ex_group:
         for ex in ex_group.exceptions:
             click.echo(ex)
@@ -254,7 +325,14 @@ async def reset(client: TransceiverClient):
 )
 @click.option("--file", metavar="FILE", help="Path to firmware image.")
 @click.option("--confirm-only", is_flag=True, help="Run only the confirm step.")
-def upgrade(host, port, file, confirm_only):
+@click.option(
+    "--window",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of write requests kept in flight during the upload.",
+)
+def upgrade(host, port, file, confirm_only, window):
     """Upgrade transceiver firmware"""
 
     if not confirm_only and not file:
@@ -275,7 +353,9 @@ def upgrade(host, port, file, confirm_only):
                     with upload_progress(
                         len(image), "Uploading firmware"
                     ) as on_progress:
-                        await trx.dfu_write_image(image, progress=on_progress)
+                        await trx.dfu_write_image(
+                            image, progress=on_progress, max_inflight=window
+                        )
                     await trx.dfu_apply()
 
                 click.echo(
@@ -292,8 +372,9 @@ def upgrade(host, port, file, confirm_only):
                         click.echo("Confirming new image")
                         await trx.dfu_confirm()
                         return
-                except TimeoutError:
-                    pass
+                except (TimeoutError, TransceiverConnectionError):
+                    # Not reachable yet while it reboots; probe again shortly.
+                    await asyncio.sleep(1.0)
             click.echo("Timed out")
         except Exception as ex:
             click.echo(f"Error: {ex}", err=True)
@@ -1,11 +1,10 @@
 import asyncio
 import logging
-import struct
 import time
+from collections import deque
 from collections.abc import AsyncIterator, Callable, Iterator
 from contextlib import contextmanager
 from dataclasses import dataclass
-from io import BytesIO
 from typing import (
     Any,
     Literal,
@@ -71,6 +70,37 @@ SEGMENT_FIRST = 0x80
 SEGMENT_LAST = 0x40
 SEGMENT_NUMBER_MASK = 0x3F
 
+# Leading opcode byte of a request, per opcode.
+_OPCODE_PREFIXES = {opcode: bytes((opcode,)) for opcode in OpCode}
+
+# Complete wire encoding of each opcode sent without an argument (CBOR null).
+_NULL_REQUESTS = {
+    opcode: prefix + cbor2.dumps(None) for opcode, prefix in _OPCODE_PREFIXES.items()
+}
+
+# Offset NACKed by the node when it aborts a program transfer.
+_PROGRAM_ABORT = 0xFFFFFFFF
+
+# How long to wait for further NACKs from the node before writing again, and
+# for late NACKs once the last chunk has been written.
+PROGRAM_NACK_WAIT = 0.1
+
+# Number of program writes kept in flight during a program transfer.
+PROGRAM_MAX_INFLIGHT = 4
+
+# ATT MTU assumed for program transfers when the transport doesn't report one.
+DEFAULT_ATT_MTU = 243
+
+
+# Model class that the payload of each report type is unmarshalled into.
+_REPORT_CLASSES: dict[int, type] = {
+    ReportType.SNIPPET: SnippetReport,
+    ReportType.AGGREGATES: AggregatedValuesReport,
+    ReportType.HEALTH: HealthReport,
+    ReportType.SETTINGS: SettingsReport,
+    ReportType.CAPTURE: CaptureReport,
+}
+
 
 @dataclass
 class ReportTransferInfo:
@@ -97,21 +127,16 @@ class Report:
 
     @staticmethod
     def from_record(
-        record: bytes, transfer_info: ReportTransferInfo | None = None
+        record: bytes | memoryview, transfer_info: ReportTransferInfo | None = None
     ) -> "Report":
         return Report(
-            report_type=record[0], payload_cbor=record[1:], transfer_info=transfer_info
+            report_type=record[0],
+            payload_cbor=bytes(record[1:]),
+            transfer_info=transfer_info,
         )
 
     def parse(self) -> _ParsedReport | None:
-        report_classes: dict[int, type] = {
-            int(ReportType.SNIPPET): SnippetReport,
-            int(ReportType.AGGREGATES): AggregatedValuesReport,
-            int(ReportType.HEALTH): HealthReport,
-            int(ReportType.SETTINGS): SettingsReport,
-            int(ReportType.CAPTURE): CaptureReport,
-        }
-        if report_class := report_classes.get(self.report_type):
+        if report_class := _REPORT_CLASSES.get(self.report_type):
             return unmarshal(report_class, cbor2.loads(self.payload_cbor))
         else:
             return None
@@ -120,28 +145,49 @@ class Report:
 class _ReportBuffer:
     def __init__(self):
         self.start_time: float = time.time()
+        # Elapsed time is measured on the monotonic clock so that wall-clock
+        # adjustments can't skew it.
+        self._start_monotonic = time.monotonic()
         self.end_time: float | None = None
         self.num_segments: int = 0
-        self._buffer = bytearray()
+        self._num_bytes = 0
+        self._report_type: int | None = None
+        # Segment payloads are kept as received and joined once when the
+        # report is finished, so each byte is copied only once.
+        self._payload: list[bytes | memoryview] = []
         self._finished = False
 
-    def append_segment(self, segment):
+    def append_segment(self, segment: bytes | memoryview):
         if self._finished:
             raise RuntimeError("Cannot append segment to finished buffer")
-        self._buffer.extend(segment)
+        self._num_bytes += len(segment)
         self.num_segments += 1
-
-    def finish(self):
+        if self._report_type is None:
+            if not segment:
+                return
+            # The first byte of the record is the report type.
+            self._report_type = segment[0]
+            segment = segment[1:]
+        self._payload.append(segment)
+
+    def finish(self) -> Report | None:
+        """Return the assembled report, or None if no payload was received."""
         if self._finished:
             raise RuntimeError("Buffer is already finished")
         self._finished = True
+        if self._report_type is None:
+            return None
         transfer_info = ReportTransferInfo(
             start_time=self.start_time,
-            elapsed_time=time.time() - self.start_time,
-            num_bytes=len(self._buffer),
+            elapsed_time=time.monotonic() - self._start_monotonic,
+            num_bytes=self._num_bytes,
             num_segments=self.num_segments,
         )
-        return Report.from_record(bytes(self._buffer), transfer_info=transfer_info)
+        return Report(
+            report_type=self._report_type,
+            payload_cbor=b"".join(self._payload),
+            transfer_info=transfer_info,
+        )
 
 
 class AVSSClient:
@@ -154,10 +200,14 @@ class AVSSClient:
         """
         self._transport = transport
         self._transport_closed = asyncio.Event()
-        self._report_buf = None
-        self._on_report_callbacks = []
+        self._report_buf: _ReportBuffer | None = None
+        # One queue per active reports() context. A None entry signals that
+        # the transport has closed.
+        self._report_queues: set[asyncio.Queue[Report | None]] = set()
         self._program_lock = asyncio.Lock()
-        self._program_nack_queue = None
+        # NACKed offsets received during a program transfer. Only ever
+        # drained without waiting, so a plain deque is enough.
+        self._program_nacks: deque[int] | None = None
         self._control_point_lock = asyncio.Lock()
 
         self.control_point_timeout: float | None = 5.0
@@ -166,40 +216,23 @@ class AVSSClient:
         # Register callbacks with transport
         transport.set_report_callback(self._on_report_notify)
         transport.set_program_callback(self._on_program_notify)
-        transport.set_closed_callback(self._transport_closed.set)
+        transport.set_closed_callback(self._on_transport_closed)
 
     async def wait_for_disconnection(self) -> None:
         await self._transport_closed.wait()
 
-    def _callback_and_generator(
-        self,
-    ) -> tuple[Callable[[Report], None], AsyncIterator[Report]]:
-
-        queue: asyncio.Queue[Report] = asyncio.Queue()
-
-        def _callback(report: Report) -> None:
-            queue.put_nowait(report)
-
-        async def _generator() -> AsyncIterator[Report]:
-            async with asyncio.TaskGroup() as tg:
-                monitor_task = tg.create_task(self._transport_closed.wait())
+    def _on_transport_closed(self) -> None:
+        self._transport_closed.set()
+        for queue in self._report_queues:
+            queue.put_nowait(None)
 
-                while True:
-                    get_task = tg.create_task(queue.get())
+    async def _report_generator(
+        self, queue: asyncio.Queue[Report | None]
+    ) -> AsyncIterator[Report]:
+        while (report := await queue.get()) is not None:
+            yield report
 
-                    done, _ = await asyncio.wait(
-                        (monitor_task, get_task), return_when=asyncio.FIRST_COMPLETED
-                    )
-
-                    if get_task in done:
-                        yield get_task.result()
-                    else:
-                        get_task.cancel()
-                        break
-
-            raise AVSSConnectionError("Disconnected during report iteration.")
-
-        return _callback, _generator()
+        raise AVSSConnectionError("Disconnected during report iteration.")
 
     @overload
     @contextmanager
@@ -220,10 +253,13 @@ class AVSSClient:
         Returns:
             An async generator that yields reports from the underlying queue.
         """
-        callback, generator = self._callback_and_generator()
+        queue: asyncio.Queue[Report | None] = asyncio.Queue()
+        if self._transport_closed.is_set():
+            queue.put_nowait(None)
+        generator = self._report_generator(queue)
         try:
-            # Add to the list of callbacks to call when a message is received
-            self._on_report_callbacks.append(callback)
+            # Add to the set of queues to put reports on when received
+            self._report_queues.add(queue)
 
             # Back to the caller (run whatever is inside the with statement)
             if parse:
@@ -234,17 +270,16 @@ class AVSSClient:
             else:
                 yield generator
         finally:
-            # We are exiting the with statement. Remove the callback from the list.
-            self._on_report_callbacks.remove(callback)
+            # We are exiting the with statement. Stop queueing reports.
+            self._report_queues.remove(queue)
 
     def _on_report_notify(self, segment):
         """Handle Report characteristic notifications"""
 
         segment_hdr = segment[0]
         segment_number = segment_hdr & SEGMENT_NUMBER_MASK
-        segment_payload = segment[1:]
-
-        logger.debug("Report segment received")
+        # A view avoids copying the payload before the report is joined.
+        segment_payload = memoryview(segment)[1:]
 
         if segment_hdr & SEGMENT_FIRST:
             if self._report_buf is not None:
@@ -272,12 +307,14 @@ class AVSSClient:
 
         if segment_hdr & SEGMENT_LAST:
             report = self._report_buf.finish()
-            for callback in self._on_report_callbacks:
-                try:
-                    callback(report)
-                except Exception:
-                    logger.error("Handling report failed", exc_info=True)
+            num_segments = self._report_buf.num_segments
             self._report_buf = None
+            if report is None:
+                logger.warning("Empty report dropped (%d segments)", num_segments)
+                return
+            logger.debug("Report received (%d segments)", num_segments)
+            for queue in self._report_queues:
+                queue.put_nowait(report)
 
     async def _request(
         self, opcode: OpCode, argument: Any, *, timeout: float | bool | None = True
@@ -310,10 +347,10 @@ class AVSSClient:
             timeout = None
 
         # Serialize request
-        with BytesIO() as fp:
-            fp.write(bytes((opcode,)))
-            cbor2.dump(marshal(argument), fp)
-            req_bytes = fp.getvalue()
+        if argument is None:
+            req_bytes = _NULL_REQUESTS[opcode]
+        else:
+            req_bytes = _OPCODE_PREFIXES[opcode] + cbor2.dumps(marshal(argument))
 
         # Send request and await response
         async with asyncio.timeout(timeout):
@@ -519,60 +556,111 @@ class AVSSClient:
         return await self._void_request(OpCode.TRIGGER_CAPTURE, arg)
 
     def _on_program_notify(self, data):
-        (offset,) = struct.unpack("<L", data)
-        if self._program_nack_queue:
-            self._program_nack_queue.put_nowait(offset)
+        offset = int.from_bytes(data, "little")
+        if self._program_nacks is not None:
+            self._program_nacks.append(offset)
 
     async def program_transfer(
         self,
         binary,
-        att_mtu=243,
+        att_mtu: int | None = None,
         progress: Callable[[int], None] | None = None,
+        *,
+        max_inflight: int = PROGRAM_MAX_INFLIGHT,
     ):
         """Transfer a firmware binary to a node, optionally reporting progress.
 
         Args:
-            binary:   Raw firmware binary (after ``prepare_upgrade`` was called).
-            att_mtu:  ATT MTU for the connection.
-            progress: Optional callback invoked with the cumulative number of
-                      bytes written so far, after each chunk.
+            binary:       Raw firmware binary (after ``prepare_upgrade`` was called).
+            att_mtu:      ATT MTU for the connection. By default the write size
+                          reported by the transport is used, or an ATT MTU of
+                          243 if the transport can't tell.
+            progress:     Optional callback invoked with the cumulative number of
+                          bytes written so far, after each chunk.
+            max_inflight: Number of writes issued before waiting for the oldest
+                          one to complete.
         """
         # Write without response is limited to ATT MTU - 3 and
         # we use 4 bytes for offset.
-        chunk_size = (att_mtu - 3) - 4
+        if att_mtu is not None:
+            write_size = att_mtu - 3
+        else:
+            write_size = self._transport.max_program_write_size() or (
+                DEFAULT_ATT_MTU - 3
+            )
+        chunk_size = write_size - 4
+        total = len(binary)
         offset = 0
+        # Pending writes together with the offset reached once they complete.
+        inflight: deque[tuple[asyncio.Task[None], int]] = deque()
+
+        async def reap() -> None:
+            task, end = inflight.popleft()
+            await task
+            if progress is not None:
+                progress(end)
 
         async with self._program_lock:
-            self._program_nack_queue = asyncio.Queue()
+            self._program_nacks = deque()
 
-            while offset < len(binary):
-                try:
+            try:
+                with memoryview(binary) as view:
                     while True:
-                        # Wait a short while for a NACK message to indicate the
-                        # node is not in sync with our writes.
-                        offset = await asyncio.wait_for(
-                            self._program_nack_queue.get(), timeout=0.04
-                        )
-                        if offset == 0xFFFFFFFF:
-                            raise RuntimeError("Program transfer aborted")
-                        # We received a NACK so we wait a short while to see
-                        # if any more NACKs turn up before we continue writing.
-                        # This aids re-synchronization if multiple write requests
-                        # are queued .
-                        await asyncio.sleep(0.1)
-                except TimeoutError:
-                    # No NACK was received after 40 ms of waiting so we assume
-                    # the write operation is on track.
-                    pass
-                end = offset + chunk_size
-                req = bytearray(struct.pack("<L", offset))
-                if end < len(binary):
-                    req.extend(binary[offset:end])
-                else:
-                    req.extend(binary[offset:])
-                offset = end
-                await self._transport.program_write(bytes(req))
-                if progress is not None:
-                    # offset can overshoot on the final chunk since it is not
-                    # clamped above; report the true byte count.
-                    progress(min(offset, len(binary)))
+                        # A NACK indicates the node is not in sync with our
+                        # writes and carries the offset it expects next.
+                        if offset < total:
+                            nack_offset = self._drain_program_nacks()
+                            if nack_offset is not None:
+                                while inflight:
+                                    await reap()
+                        else:
+                            # Everything is written; give the node a chance to
+                            # NACK any of the final chunks before finishing.
+                            while inflight:
+                                await reap()
+                            await asyncio.sleep(PROGRAM_NACK_WAIT)
+                            nack_offset = self._drain_program_nacks()
+                            if nack_offset is None:
+                                break
+                        while nack_offset is not None:
+                            offset = nack_offset
+                            # We received a NACK so we wait a short while to
+                            # see if any more NACKs turn up before we continue
+                            # writing. This aids re-synchronization if multiple
+                            # write requests are queued.
+                            await asyncio.sleep(PROGRAM_NACK_WAIT)
+                            nack_offset = self._drain_program_nacks()
+                        if offset >= total:
+                            continue
+
+                        end = min(offset + chunk_size, total)
+                        req = offset.to_bytes(4, "little") + view[offset:end]
+                        offset = end
+                        task = asyncio.create_task(self._transport.program_write(req))
+                        inflight.append((task, end))
+                        if len(inflight) >= max_inflight:
+                            await reap()
+            finally:
+                for task, _ in inflight:
+                    task.cancel()
+                # Don't leave writes behind that could still reach the node.
+                await asyncio.gather(
+                    *(task for task, _ in inflight), return_exceptions=True
+                )
+
+    def _drain_program_nacks(self) -> int | None:
+        """Return the offset of the latest pending NACK, or None if there is none.
+
+        Raises:
+            RuntimeError: If the node aborted the program transfer.
+        """
+        nacks = self._program_nacks
+        assert nacks is not None
+
+        if not nacks:
+            return None
+        if _PROGRAM_ABORT in nacks:
+            raise RuntimeError("Program transfer aborted")
+        offset = nacks[-1]
+        nacks.clear()
+        return offset
@@ -84,9 +84,9 @@ class AVSSControlPointError(AVSSError):
         """
         # Handle raw integers (for newer/unknown codes)
         if not isinstance(rc, ResponseCode):
-            if rc in ResponseCode:
+            try:
                 rc = ResponseCode(rc)
-            else:
+            except ValueError:
                 return AVSSControlPointError(
                     f"Device returned response code {rc} (firmware may be newer than client)",
                     response_code=rc,
@@ -97,20 +97,11 @@ class AVSSControlPointError(AVSSError):
             raise ValueError("ResponseCode.OK is not an error response code")
 
         # Map specific codes to dedicated exception types
-        if rc == ResponseCode.OPCODE_UNSUPPORTED:
-            return AVSSOpCodeUnsupportedError(opcode=opcode, response_code=rc)
-        elif rc == ResponseCode.BAD_ARGUMENT:
-            return AVSSBadArgumentError(opcode=opcode, response_code=rc)
+        if error_class := _ERROR_CLASSES.get(rc):
+            return error_class(opcode=opcode, response_code=rc)
 
         # All other codes use generic error with descriptive message
-        messages = {
-            ResponseCode.ERROR: "Operation failed",
-            ResponseCode.BUSY: "Device is busy",
-            ResponseCode.UNEXPECTED: "Unexpected error occurred",
-            # NOTE: Some unused response code intentionally omitted.
-        }
-
-        message = messages.get(rc, None)
+        message = _ERROR_MESSAGES.get(rc)
         if message is None:
             message = f"Operation failed with response code {rc}"
 
@@ -131,3 +122,16 @@ class AVSSBadArgumentError(AVSSControlPointError):
     def __init__(self, opcode: OpCode, response_code: int | ResponseCode):
         msg = "Invalid argument"
         super().__init__(msg, response_code=response_code, opcode=opcode)
+
+
+_ERROR_CLASSES = {
+    ResponseCode.OPCODE_UNSUPPORTED: AVSSOpCodeUnsupportedError,
+    ResponseCode.BAD_ARGUMENT: AVSSBadArgumentError,
+}
+
+_ERROR_MESSAGES = {
+    ResponseCode.ERROR: "Operation failed",
+    ResponseCode.BUSY: "Device is busy",
+    ResponseCode.UNEXPECTED: "Unexpected error occurred",
+    # NOTE: Some unused response code intentionally omitted.
+}
@@ -4,106 +4,106 @@ from typing import Annotated, Any
 from anura.marshalling import CborKey
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportSnippetArgs:
     count: Annotated[int, CborKey(0)]
     auto_resume: Annotated[bool, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportAggregatesArgs:
     count: Annotated[int, CborKey(0)]
     auto_resume: Annotated[bool, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportCaptureArgs:
     count: Annotated[int, CborKey(0)]
     auto_resume: Annotated[bool, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportHealthArgs:
     count: Annotated[bool | int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportSettings:
     current: Annotated[bool, CborKey(0)]
     pending: Annotated[bool, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class PrepareUpgradeArgs:
     image: Annotated[int, CborKey(0)]
     size: Annotated[int, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ApplyUpgradeArgs:
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class ConfirmUpgradeArgs:
     image: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class TestThroughputArgs:
     duration: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ApplySettingsArgs:
     persist: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class DeactivateArgs:
     key: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class TriggerMeasurementArgs:
     duration_ms: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class TriggerCaptureArgs:
     duration_ms: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ApplySettingsResponse:
     will_reboot: Annotated[bool, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class WriteSettingsResponse:
     num_unhandled: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class WriteSettingsV2Args:
     settings: Annotated[dict[int, Any], CborKey(0)]
     reset_defaults: Annotated[bool, CborKey(1)]
     apply: Annotated[bool, CborKey(2)]
 
 
-@dataclass
+@dataclass(slots=True)
 class WriteSettingsV2Response:
     num_unhandled: Annotated[int, CborKey(0)]
     will_reboot: Annotated[bool, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetVersionResponse:
     version: Annotated[str, CborKey(0)]
     build_version: Annotated[str, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetFirmwareInfoResponse:
     app_version: Annotated[int, CborKey(0)]
     app_build_version: Annotated[str, CborKey(1)]
@@ -112,7 +112,7 @@ class GetFirmwareInfoResponse:
     net_build_version: Annotated[str, CborKey(4)]
 
 
-@dataclass
+@dataclass(slots=True)
 class SnippetReport:
     start_time: Annotated[int, CborKey(0)]
     sample_rate: Annotated[float, CborKey(1)]
@@ -125,25 +125,25 @@ class SnippetReport:
     transmission_offset: Annotated[int | None, CborKey(8)] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CaptureReport:
     start_time: Annotated[int, CborKey(0)]
     range_: Annotated[int, CborKey(2)]
     samples: Annotated[dict[int, bytes], CborKey(3)]
     is_synced: Annotated[bool, CborKey(4)]
-    duration: Annotated[int, CborKey(5)]
-    start_time_monotonic: Annotated[int, CborKey(6)]
-    duration_monotonic: Annotated[int, CborKey(7)]
+    duration: Annotated[int | None, CborKey(5)] = None
+    start_time_monotonic: Annotated[int | None, CborKey(6)] = None
+    duration_monotonic: Annotated[int | None, CborKey(7)] = None
     transmission_offset: Annotated[int | None, CborKey(8)] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AggregatedValuesReport:
     start_time: Annotated[int, CborKey(0)]
     values: Annotated[dict[int, float], CborKey(2)]
 
 
-@dataclass
+@dataclass(slots=True)
 class HealthReport:
     uptime: Annotated[int, CborKey(0)]
     reboot_count: Annotated[int, CborKey(1)]
@@ -157,7 +157,7 @@ class HealthReport:
     clock_sync_diff: Annotated[int | None, CborKey(9)] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SettingsReport:
     settings: Annotated[dict | None, CborKey(0)] = None
     pending_settings: Annotated[dict | None, CborKey(1)] = None
@@ -33,23 +33,23 @@ class SettingsMapper:
 
     @staticmethod
     def from_readable(settings):
-        def map_key(key):
-            try:
-                return SettingsMapper.forward_map[key]
-            except KeyError:
-                try:
-                    return int(key)
-                except ValueError:
-                    raise ValueError(f"Invalid key {key}") from None
-
-        return {map_key(k): v for k, v in settings.items()}
+        forward_map = SettingsMapper.forward_map
+        return {
+            forward_map[k] if k in forward_map else _int_key(k): v
+            for k, v in settings.items()
+        }
 
     @staticmethod
     def to_readable(settings):
-        def map_key(key):
-            try:
-                return SettingsMapper.reverse_map[key]
-            except KeyError:
-                return str(key)
+        reverse_map = SettingsMapper.reverse_map
+        return {
+            reverse_map[k] if k in reverse_map else str(k): v
+            for k, v in settings.items()
+        }
+
 
-        return {map_key(k): v for k, v in settings.items()}
+def _int_key(key):
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid key {key}") from None
@@ -58,6 +58,15 @@ class AVSSTransport(ABC):
             AVSSConnectionError: If transport is not open or connection lost
         """
 
+    def max_program_write_size(self) -> int | None:
+        """Largest value accepted by `program_write`, if the transport knows it.
+
+        Returns:
+            The size in bytes, or None if it can't be determined, in which case
+            the caller falls back to its own default.
+        """
+        return None
+
     @abstractmethod
     def set_report_callback(self, callback: Callable[[bytes], None]) -> None:
         """Register callback for report characteristic notifications.
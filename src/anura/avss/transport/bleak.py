@@ -11,6 +11,9 @@ from .base import AVSSTransport
 
 logger = logging.getLogger(__name__)
 
+# Write without response payload size for the default ATT MTU of 23.
+_DEFAULT_WRITE_SIZE = 20
+
 
 class BleakAVSSTransport(AVSSTransport):
     """AVSS transport using Bleak for direct BLE communication.
@@ -102,11 +105,12 @@ class BleakAVSSTransport(AVSSTransport):
         if self._client is None:
             raise RuntimeError("BleakAVSSTransport is not open")
 
-        # Flush any lingering responses
-        while not self._cp_response_q.empty():
-            logger.warning("Flushing lingering responses")
-            await self._cp_response_q.get()
-            self._cp_response_q.task_done()
+        # Flush a lingering response; the queue holds at most one.
+        try:
+            self._cp_response_q.get_nowait()
+            logger.warning("Flushing lingering response")
+        except asyncio.QueueEmpty:
+            pass
 
         try:
             await self._client.write_gatt_char(
@@ -115,9 +119,7 @@ class BleakAVSSTransport(AVSSTransport):
         except BleakError as e:
             raise AVSSConnectionError(str(e)) from e
 
-        response = await self._cp_response_q.get()
-        self._cp_response_q.task_done()
-        return response
+        return await self._cp_response_q.get()
 
     async def program_write(self, value: bytes) -> None:
         if self._client is None:
@@ -130,6 +132,21 @@ class BleakAVSSTransport(AVSSTransport):
         except BleakError as e:
             raise AVSSConnectionError(str(e)) from e
 
+    def max_program_write_size(self) -> int | None:
+        if self._client is None:
+            return None
+
+        char = self._client.services.get_characteristic(
+            avss.uuids.ProgramCharacteristicUuid
+        )
+        if char is None:
+            return None
+
+        size = char.max_write_without_response_size
+        # Bleak reports the ATT default of 20 when the negotiated MTU is
+        # unknown (e.g. BlueZ < 5.62), so treat that as "not known".
+        return size if size > _DEFAULT_WRITE_SIZE else None
+
     def set_report_callback(self, callback) -> None:
         self._report_callback = callback
 
@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import enum
 import logging
 
@@ -11,6 +12,7 @@ from anura.transceiver.models import (
     AVSSReportNotifiedEvent,
     BluetoothAddrLE,
     NodeDisconnectedEvent,
+    NodeServiceDiscoveredEvent,
 )
 
 from .base import AVSSTransport
@@ -47,6 +49,7 @@ class ProxyAVSSTransport(AVSSTransport):
         self._report_callback = None
         self._program_callback = None
         self._closed_callback = None
+        self._service_discovered = asyncio.Event()
 
     async def open(self) -> None:
         if self._state is not _State.CREATED:
@@ -68,6 +71,9 @@ class ProxyAVSSTransport(AVSSTransport):
         other_error_count = 0
 
         while True:
+            # Discovery finishing while the request is in flight should still
+            # cut the wait below short.
+            self._service_discovered.clear()
             try:
                 get_version_request = b"\x05"  # GET_VERSION opcode
                 await self._transceiver.avss_request(self._address, get_version_request)
@@ -84,7 +90,11 @@ class ProxyAVSSTransport(AVSSTransport):
                         raise AVSSConnectionError(
                             f"Transceiver report an error when polling for node: {e.error}"
                         ) from e
-            await asyncio.sleep(1.0)
+
+            # Poll again after a second, or as soon as the transceiver has
+            # discovered the node's services.
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._service_discovered.wait(), 1.0)
 
     def _on_closed(self, task: asyncio.Task):
         assert self._state is _State.OPENED
@@ -123,6 +133,8 @@ class ProxyAVSSTransport(AVSSTransport):
                     case AVSSProgramNotifiedEvent(address=self._address):
                         if cb := self._program_callback:
                             asyncio.get_running_loop().call_soon(cb, notification.value)
+                    case NodeServiceDiscoveredEvent(address=self._address):
+                        self._service_discovered.set()
                     case NodeDisconnectedEvent(address=self._address):
                         break  # connection broken
 
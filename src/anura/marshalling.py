@@ -56,6 +56,8 @@ def register_codec(
     default dataclass record rule (e.g. a leaf type, or a dataclass encoded as
     a positional array)."""
     _codecs[tp] = Codec(marshal, unmarshal)
+    _marshaller.cache_clear()
+    _unmarshaller.cache_clear()
 
 
 @functools.cache
@@ -82,61 +84,129 @@ def _field_keys(cls: type) -> dict[str, tuple[int, Any]]:
 def marshal(obj: Any) -> dict | list | Any:
     """Convert an object representation of a message or data type to a
     structure consisting of dicts, lists and primitive types."""
-    if codec := _codecs.get(type(obj)):
-        return codec.marshal(obj)
-    elif is_dataclass(obj) and not isinstance(obj, type):
-        return {
-            key: marshal(getattr(obj, name))
-            for name, (key, _) in _field_keys(type(obj)).items()
+    return _marshaller(type(obj))(obj)
+
+
+@functools.cache
+def _marshaller(cls: type) -> Callable[[Any], Any]:
+    """Build the function that marshals instances of ``cls``. Cached per type,
+    like `_unmarshaller`."""
+    if codec := _codecs.get(cls):
+        return codec.marshal
+    elif is_dataclass(cls):
+        # Fields declared as primitives are copied as is, skipping a call into
+        # marshal() per scalar.
+        fields = [
+            (name, key, _is_primitive(field_type))
+            for name, (key, field_type) in _field_keys(cls).items()
+        ]
+        return lambda obj: {
+            key: getattr(obj, name) if primitive else marshal(getattr(obj, name))
+            for name, key, primitive in fields
         }
-    elif isinstance(obj, list):
-        return [marshal(v) for v in obj]
-    elif isinstance(obj, dict):
-        return {marshal(k): marshal(v) for k, v in obj.items()}
+    elif issubclass(cls, list):
+        return lambda obj: [marshal(v) for v in obj]
+    elif issubclass(cls, dict):
+        return lambda obj: {marshal(k): marshal(v) for k, v in obj.items()}
     else:
-        return obj
+        return _identity
+
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+
+_PRIMITIVES = (int, float, str, bytes, bool)
+
+
+def _is_primitive(cls: Any) -> bool:
+    """Whether values of type ``cls`` (or ``cls | None``) marshal to themselves."""
+    if isinstance(cls, types.UnionType):
+        return all(arg is types.NoneType or _is_primitive(arg) for arg in get_args(cls))
+    return cls in _PRIMITIVES and cls not in _codecs
 
 
 def unmarshal(cls: type[T], struct: Any) -> T:
+    return cast(T, _unmarshaller(cls)(struct))
+
+
+@functools.cache
+def _unmarshaller(cls: Any) -> Callable[[Any], Any]:
+    """Build the function that unmarshals a structure into ``cls``.
+
+    The type is analysed once and the result cached, so unmarshalling a
+    message doesn't repeat the codec lookup and type introspection for every
+    field of every message.
+    """
     if codec := _codecs.get(cls):
-        return codec.unmarshal(struct)
+        return codec.unmarshal
     elif is_dataclass(cls):
-        if not isinstance(struct, dict):
-            raise ValueError(
-                f"Expected dict for dataclass {cls.__name__}, "
-                f"got {type(struct).__name__}"
-            )
-        attributes = {
-            name: unmarshal(field_type, struct[key])
-            for name, (key, field_type) in _field_keys(cls).items()
-            if key in struct
-        }
-        return cast(T, cls(**attributes))
+        return _dataclass_unmarshaller(cls)
     elif isinstance(cls, types.UnionType):
         match get_args(cls):
             case inner_cls, types.NoneType:
-                return cast(T, unmarshal(inner_cls, struct))
+                return _unmarshaller(inner_cls)
             case _:
                 # In principle this could be extended, but `SomeClass | None`
                 # is enough for our use case.
-                raise ValueError(f"Unsupported union type: {cls}")
+                return _raiser(ValueError, f"Unsupported union type: {cls}")
     elif isinstance(cls, types.GenericAlias):
         origin = get_origin(cls)
         if origin is list:
-            item_cls = get_args(cls)[0]
-            return cast(T, [unmarshal(item_cls, v) for v in struct])
+            unmarshal_item = _unmarshaller(get_args(cls)[0])
+            return lambda struct: [unmarshal_item(v) for v in struct]
         elif origin is dict:
             key_cls, val_cls = get_args(cls)
-            return cast(
-                T,
-                {unmarshal(key_cls, k): unmarshal(val_cls, v) for k, v in struct.items()},
-            )
+            unmarshal_key = _unmarshaller(key_cls)
+            unmarshal_val = _unmarshaller(val_cls)
+            return lambda struct: {
+                unmarshal_key(k): unmarshal_val(v) for k, v in struct.items()
+            }
         else:
-            raise ValueError("Unsupported generic type.")
+            return _raiser(ValueError, "Unsupported generic type.")
     else:
-        if not isinstance(struct, cls):
-            raise TypeError(f"{struct!r} not decodable as type {cls}")
-        return struct
+
+        def unmarshal_leaf(struct: Any) -> Any:
+            if not isinstance(struct, cls):
+                raise TypeError(f"{struct!r} not decodable as type {cls}")
+            return struct
+
+        return unmarshal_leaf
+
+
+def _dataclass_unmarshaller(cls: Any) -> Callable[[Any], Any]:
+    # Field unmarshallers are resolved on first use rather than here, so that
+    # self-referencing dataclasses don't recurse while being analysed.
+    fields: list[tuple[str, int, Callable[[Any], Any]]] | None = None
+
+    def unmarshal_dataclass(struct: Any) -> Any:
+        nonlocal fields
+        if not isinstance(struct, dict):
+            raise ValueError(
+                f"Expected dict for dataclass {cls.__name__}, "
+                f"got {type(struct).__name__}"
+            )
+        if fields is None:
+            fields = [
+                (name, key, _unmarshaller(field_type))
+                for name, (key, field_type) in _field_keys(cls).items()
+            ]
+        return cls(
+            **{
+                name: unmarshal_field(struct[key])
+                for name, key, unmarshal_field in fields
+                if key in struct
+            }
+        )
+
+    return unmarshal_dataclass
+
+
+def _raiser(error: type[Exception], message: str) -> Callable[[Any], Any]:
+    def raise_error(struct: Any) -> Any:
+        raise error(message)
+
+    return raise_error
 
 
 def _marshal_ipv4address(addr: ipaddress.IPv4Address) -> cbor2.CBORTag:
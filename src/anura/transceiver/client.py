@@ -1,4 +1,5 @@
 import asyncio
+from collections import deque
 from collections.abc import AsyncIterator, Callable, Generator
 from contextlib import contextmanager
 from typing import (
@@ -31,7 +32,10 @@ class TransceiverClient:
         self._connection_task: asyncio.Task[None] | None = None
         self._connection_closed = asyncio.Event()
         self._connection_exception: BaseException | None = None
-        self._notification_callbacks: list[Callable[[models.Notification], None]] = []
+        # Callbacks receive None once the connection has closed.
+        self._notification_callbacks: list[
+            Callable[[models.Notification | None], None]
+        ] = []
         self._next_request_token: int = 0
 
     async def __aenter__(self):
@@ -42,13 +46,21 @@ class TransceiverClient:
         await self.disconnect()
 
     async def _handle_connection(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Time of the last received message; any traffic shows the connection
+        # is alive, so keep_alive() only pings when the link has gone quiet.
+        last_received = loop.time()
+
         async def recv_task():
+            nonlocal last_received
             while True:
                 try:
                     message_bytes = await self._transport.read()
                 except Exception as e:
                     raise TransceiverError("Transport read failed") from e
 
+                last_received = loop.time()
+
                 try:
                     message = cbor2.loads(message_bytes)
                 except cbor2.CBORDecodeError as e:
@@ -67,7 +79,9 @@ class TransceiverClient:
 
         async def keep_alive():
             while True:
-                await asyncio.sleep(1.0)
+                await asyncio.sleep(1.0 - (loop.time() - last_received))
+                if loop.time() - last_received < 1.0:
+                    continue
 
                 try:
                     await asyncio.wait_for(self.ping(), 1.0)
@@ -111,6 +125,9 @@ class TransceiverClient:
 
         self._connection_closed.set()
 
+        for callback in self._notification_callbacks:
+            callback(None)
+
     async def disconnect(self) -> None:
         if not self._connection_task:
             raise RuntimeError("Client has not been connected")
@@ -202,43 +219,29 @@ class TransceiverClient:
     def _callback_and_generator(
         self,
     ) -> tuple[
-        Callable[[models.Notification], None], AsyncIterator[models.Notification]
+        Callable[[models.Notification | None], None],
+        AsyncIterator[models.Notification],
     ]:
-        queue: asyncio.Queue[models.Notification] = asyncio.Queue()
-
-        def _callback(msg: models.Notification) -> None:
-            queue.put_nowait(msg)
+        # None is queued when the connection closes
+        queue: asyncio.Queue[models.Notification | None] = asyncio.Queue()
 
         async def _generator() -> AsyncIterator[models.Notification]:
-            monitor_task = asyncio.create_task(self._connection_closed.wait())
-            try:
-                while True:
-                    get_task = asyncio.create_task(queue.get())
-                    try:
-                        done, _ = await asyncio.wait(
-                            [monitor_task, get_task],
-                            return_when=asyncio.FIRST_COMPLETED,
-                        )
-
-                        if get_task in done:
-                            yield get_task.result()
-                        else:
-                            if self._connection_exception:
-                                raise TransceiverConnectionError(
-                                    f"Connection broken during notification iteration: {self._connection_exception}"
-                                ) from self._connection_exception
-                            else:
-                                raise TransceiverConnectionError(
-                                    "Connection broken during notification iteration"
-                                ) from None
-                    finally:
-                        get_task.cancel()
-                        await asyncio.wait([get_task])
-            finally:
-                monitor_task.cancel()
-                await asyncio.wait([monitor_task])
-
-        return _callback, _generator()
+            if self._connection_closed.is_set():
+                queue.put_nowait(None)
+
+            while (msg := await queue.get()) is not None:
+                yield msg
+
+            if self._connection_exception:
+                raise TransceiverConnectionError(
+                    f"Connection broken during notification iteration: {self._connection_exception}"
+                ) from self._connection_exception
+            else:
+                raise TransceiverConnectionError(
+                    "Connection broken during notification iteration"
+                ) from None
+
+        return queue.put_nowait, _generator()
 
     @contextmanager
     def notifications(
@@ -279,23 +282,45 @@ class TransceiverClient:
         image: bytes,
         chunk_size: int = 300,
         progress: Callable[[int], None] | None = None,
+        *,
+        max_inflight: int = 1,
     ):
         """Write a firmware image in chunks, optionally reporting progress.
 
         Args:
-            image:      Raw firmware binary (after ``dfu_prepare`` was called).
-            chunk_size: Number of bytes per ``dfu_write`` request.
-            progress:   Optional callback invoked with the cumulative number of
-                        bytes written so far, after each chunk.
+            image:        Raw firmware binary (after ``dfu_prepare`` was called).
+            chunk_size:   Number of bytes per ``dfu_write`` request.
+            progress:     Optional callback invoked with the cumulative number of
+                          bytes written so far, after each chunk.
+            max_inflight: Number of ``dfu_write`` requests sent before waiting
+                          for the oldest response. Requests are sent in offset
+                          order; the default of 1 awaits each one in turn.
         """
         offset = 0
         total = len(image)
-        while offset < total:
-            end = min(offset + chunk_size, total)
-            await self.dfu_write(offset, image[offset:end])
-            offset = end
+        # Pending writes together with the offset reached once they complete.
+        inflight: deque[tuple[asyncio.Task[Any], int]] = deque()
+
+        async def reap() -> None:
+            task, end = inflight.popleft()
+            await task
             if progress is not None:
-                progress(offset)
+                progress(end)
+
+        try:
+            while offset < total:
+                end = min(offset + chunk_size, total)
+                task = asyncio.create_task(self.dfu_write(offset, image[offset:end]))
+                inflight.append((task, end))
+                offset = end
+                if len(inflight) >= max_inflight:
+                    await reap()
+
+            while inflight:
+                await reap()
+        finally:
+            for task, _ in inflight:
+                task.cancel()
 
     async def dfu_apply(self, permanent=False):
         if permanent:
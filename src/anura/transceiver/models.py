@@ -1,4 +1,3 @@
-import binascii
 import enum
 import ipaddress
 import re
@@ -46,7 +45,7 @@ class APIErrorCode(enum.IntEnum):
     """Failed to encode the response."""
 
 
-@dataclass
+@dataclass(slots=True)
 class APIError:
     """API error response.
 
@@ -65,23 +64,20 @@ class APIError:
 
 
 class Notification:
+    __slots__ = ()
+
     @staticmethod
     def parse(notification_type, argument):
-        event_classes = {
-            "node_connected": NodeConnectedEvent,
-            "node_disconnected": NodeDisconnectedEvent,
-            "node_service_discovered": NodeServiceDiscoveredEvent,
-            "avss_report_notified": AVSSReportNotifiedEvent,
-            "avss_program_notified": AVSSProgramNotifiedEvent,
-            "scan_nodes_received": ScanNodesReceivedEvent,
-        }
-        if event_class := event_classes.get(notification_type):
+        if event_class := _EVENT_CLASSES.get(notification_type):
             return unmarshal(event_class, argument)
         else:
             return UnknownNotification(notification_type, argument)
 
 
-@dataclass(frozen=True)
+_BLUETOOTH_ADDR_PATTERN = re.compile(r"([^\/]+)(\/(random|public))?", re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
 class BluetoothAddrLE:
     type: int
     address: bytes
@@ -97,7 +93,7 @@ class BluetoothAddrLE:
         return f'BluetoothAddrLE("{self.__str__()}")'
 
     def address_str(self) -> str:
-        return binascii.hexlify(self.address, ":").decode("utf-8").upper()
+        return self.address.hex(":").upper()
 
     @staticmethod
     def parse(str):
@@ -111,8 +107,7 @@ class BluetoothAddrLE:
         [0, b'\\x00\\x00\\x00\\x00\\x00\\x00']
         """
 
-        word_pattern = re.compile(r"([^\/]+)(\/(random|public))?", re.IGNORECASE)
-        match = word_pattern.fullmatch(str)
+        match = _BLUETOOTH_ADDR_PATTERN.fullmatch(str)
 
         if not match:
             raise ValueError()
@@ -146,50 +141,50 @@ register_codec(
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class AssignedNode:
     address: Annotated[BluetoothAddrLE, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class SetAssignedNodesArgs:
     nodes: Annotated[list[AssignedNode], CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetAssignedNodesResult:
     nodes: Annotated[list[AssignedNode], CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectedNode:
     address: Annotated[BluetoothAddrLE, CborKey(0)]
     rssi: Annotated[int, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetConnectedNodesResult:
     nodes: Annotated[list[ConnectedNode], CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class AVSSRequestArgs:
     address: Annotated[BluetoothAddrLE, CborKey(0)]
     data: Annotated[bytes, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class AVSSRequestResult:
     response: Annotated[bytes, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class AVSSProgramWriteArgs:
     address: Annotated[BluetoothAddrLE, CborKey(0)]
     data: Annotated[bytes, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetDeviceInfoResult:
     board: Annotated[str, CborKey(0)]
     hw_rev: Annotated[int, CborKey(1)]
@@ -202,14 +197,14 @@ class GetDeviceInfoResult:
     ip_addresses: Annotated[list[ipaddress.IPv4Address], CborKey(8)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetDeviceStatusResult:
     uptime: Annotated[int, CborKey(0)]
     reboot_count: Annotated[int, CborKey(1)]
     reset_cause: Annotated[int, CborKey(2)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetFirmwareInfoResult:
     dfu_status: Annotated[int, CborKey(0)]
     app_version: Annotated[int, CborKey(1)]
@@ -218,7 +213,7 @@ class GetFirmwareInfoResult:
     net_build_version: Annotated[str, CborKey(4)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetPtpStatusResult:
     port_state: Annotated[str, CborKey(0)]
     offset: Annotated[int, CborKey(1)]
@@ -226,61 +221,61 @@ class GetPtpStatusResult:
     offset_histogram: Annotated[list[int], CborKey(3)]
 
 
-@dataclass
+@dataclass(slots=True)
 class DfuPrepareArgs:
     size: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class DfuWriteArgs:
     offset: Annotated[int, CborKey(0)]
     data: Annotated[bytes, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class DfuApplyArgs:
     permanent: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class SetTimeArgs:
     time: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class GetTimeResult:
     time: Annotated[int, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeConnectedEvent(Notification):
     address: Annotated[BluetoothAddrLE, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeDisconnectedEvent(Notification):
     address: Annotated[BluetoothAddrLE, CborKey(0)]
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeServiceDiscoveredEvent(Notification):
     address: Annotated[BluetoothAddrLE, CborKey(0)]
     uuid: Annotated[UUID, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class AVSSReportNotifiedEvent(Notification):
     address: Annotated[BluetoothAddrLE, CborKey(0)]
     value: Annotated[bytes, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class AVSSProgramNotifiedEvent(Notification):
     address: Annotated[BluetoothAddrLE, CborKey(0)]
     value: Annotated[bytes, CborKey(1)]
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanNodesReceivedEvent(Notification):
     address: Annotated[BluetoothAddrLE, CborKey(0)]
     rssi: Annotated[int, CborKey(1)]
@@ -291,3 +286,14 @@ class UnknownNotification(Notification):
     def __init__(self, notification_type, argument):
         self.notification_type = notification_type
         self.argument = argument
+
+
+# Event class that the argument of each notification type is unmarshalled into.
+_EVENT_CLASSES: dict[str, type[Notification]] = {
+    "node_connected": NodeConnectedEvent,
+    "node_disconnected": NodeDisconnectedEvent,
+    "node_service_discovered": NodeServiceDiscoveredEvent,
+    "avss_report_notified": AVSSReportNotifiedEvent,
+    "avss_program_notified": AVSSProgramNotifiedEvent,
+    "scan_nodes_received": ScanNodesReceivedEvent,
+}
@@ -1,7 +1,11 @@
+import struct
 from abc import ABC, abstractmethod
 from collections.abc import Callable
 from typing import ClassVar
 
+# Both stream transports frame each message with its length, big-endian.
+LENGTH_PREFIX = struct.Struct(">H")
+
 
 class Transport(ABC):
     _registry: ClassVar[dict[str, Callable[..., "Transport"]]] = {}
@@ -1,7 +1,6 @@
 import asyncio
-import struct
 
-from .base import Transport
+from .base import LENGTH_PREFIX, Transport
 
 
 class TCPTransport(Transport, transport_type="tcp"):
@@ -22,14 +21,15 @@ class TCPTransport(Transport, transport_type="tcp"):
 
     async def send(self, payload):
         assert self._writer is not None, "Not connected"
-        self._writer.write(struct.pack(">H", len(payload)))
-        self._writer.write(payload)
+        # One write per frame, so the length prefix doesn't go out in a
+        # segment of its own (asyncio sets TCP_NODELAY).
+        self._writer.write(LENGTH_PREFIX.pack(len(payload)) + payload)
         await self._writer.drain()
 
     async def read(self):
         assert self._reader is not None, "Not connected"
-        header = await self._reader.readexactly(2)
-        (payload_len,) = struct.unpack(">H", header)
+        header = await self._reader.readexactly(LENGTH_PREFIX.size)
+        (payload_len,) = LENGTH_PREFIX.unpack(header)
         payload = await self._reader.readexactly(payload_len)
         return payload
 
@@ -1,13 +1,13 @@
 import asyncio
 import errno
 import logging
-import struct
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import usb.core  # pyright: ignore[reportMissingImports]
 import usb.util  # pyright: ignore[reportMissingImports]
 
-from .base import Transport
+from .base import LENGTH_PREFIX, Transport
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +18,14 @@ PRODUCT_ID = 0x13D4
 OUT_ENDPOINT = 0x01  # host to device
 IN_ENDPOINT = 0x81  # device to host
 MAX_PACKET_SIZE = 64
+FLUSH_READ_SIZE = 4096  # drains many queued packets per transfer
 
 EOF_SENTINEL = object()  # end of the receive queue
 
+# Messages buffered for read(). When it is full the background reader stops
+# issuing reads, and the device is left to hold off until there is room.
+RECEIVE_QUEUE_SIZE = 256
+
 
 class USBTransport(Transport, transport_type="usb"):
     """
@@ -35,12 +40,13 @@ class USBTransport(Transport, transport_type="usb"):
         self.out_ep = OUT_ENDPOINT
         self.max_packet_size = MAX_PACKET_SIZE
         self.dev: usb.core.Device | None = None
-        self.receive_queue: asyncio.Queue = asyncio.Queue()
-        self.loop = asyncio.get_event_loop()
+        self.receive_queue: asyncio.Queue = asyncio.Queue(RECEIVE_QUEUE_SIZE)
         self.reader_task: asyncio.Task | None = None
+        self._write_executor: ThreadPoolExecutor | None = None
 
     async def open_connection(self) -> None:
-        device = await self.loop.run_in_executor(
+        loop = asyncio.get_running_loop()
+        device = await loop.run_in_executor(
             None, self._find_device_by_serial, self.serial_number
         )
         if device is None:
@@ -48,15 +54,23 @@ class USBTransport(Transport, transport_type="usb"):
                 f"USB device with serial number '{self.serial_number}' not found"
             )
 
-        logger.debug(f"Transceiver found: {device}")
+        logger.debug("Transceiver found: %s", device)
         self.dev = device
+        # Each connection gets its own queue and writer thread, as close()
+        # ends both.
+        self.receive_queue = asyncio.Queue(RECEIVE_QUEUE_SIZE)
+        # Writes go through a single dedicated thread so that concurrent
+        # sends reach the device whole and in the order they were made.
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"usb-{self.serial_number}"
+        )
 
         # Set the configuration. See
         # https://libusb.sourceforge.io/api-1.0/libusb_caveats.html#configsel
         device.set_configuration()
 
         # Get rid of the kernel driver (if there is one)
-        await self.loop.run_in_executor(None, self._detach_kernel_driver)
+        await loop.run_in_executor(None, self._detach_kernel_driver)
 
         # Get rid of old data on the IN endpoint that may be buffered
         # in the device.
@@ -68,14 +82,26 @@ class USBTransport(Transport, transport_type="usb"):
 
     async def send(self, msg: bytes) -> None:
         assert self.dev is not None, "Not connected"
+        assert self._write_executor is not None
 
         if len(msg) > 0xFFFF:
             raise ValueError("Message too large", len(msg))
-        packet = struct.pack(">H", len(msg)) + msg
+        packet = LENGTH_PREFIX.pack(len(msg)) + msg
 
         # Send the message to the device, with a timeout
-        await self.loop.run_in_executor(None, self.dev.write, self.out_ep, packet, 1000)
-        logger.debug(f"Sent message: {msg}")
+        write = asyncio.get_running_loop().run_in_executor(
+            self._write_executor, self.dev.write, self.out_ep, packet, 1000
+        )
+        try:
+            await write
+        except asyncio.CancelledError:
+            # close() cancels writes still queued on the executor. Report that
+            # as a broken connection, unless this task itself is cancelled.
+            task = asyncio.current_task()
+            if task is not None and task.cancelling():
+                raise
+            raise ConnectionError("USB connection closed before sending") from None
+        logger.debug("Sent message: %s", msg)
 
     async def read(self) -> bytes:
         assert self.dev is not None, "Not connected"
@@ -85,7 +111,7 @@ class USBTransport(Transport, transport_type="usb"):
             logger.error("USB connection closed during read")
             raise asyncio.IncompleteReadError(partial=b"", expected=1)
 
-        logger.debug(f"Dequeued message: {message}")
+        logger.debug("Dequeued message: %s", message)
 
         return message
 
@@ -103,13 +129,21 @@ class USBTransport(Transport, transport_type="usb"):
             except asyncio.CancelledError:
                 pass
             except Exception as e:
-                logger.error(f"Error while cancelling reader task: {e}")
+                logger.error("Error while cancelling reader task: %s", e)
+
+        if self._write_executor is not None:
+            self._write_executor.shutdown(wait=False, cancel_futures=True)
+            self._write_executor = None
 
         usb.util.release_interface(dev, 0)
         usb.util.dispose_resources(dev)
         logger.debug("USB interface released")
 
-        await self.receive_queue.put(EOF_SENTINEL)
+        # Nobody may be reading any more, so don't wait for room; a message
+        # dropped here would have been lost with the connection anyway.
+        if self.receive_queue.full():
+            self.receive_queue.get_nowait()
+        self.receive_queue.put_nowait(EOF_SENTINEL)
 
     @staticmethod
     def list_devices() -> list[str]:
@@ -151,53 +185,58 @@ class USBTransport(Transport, transport_type="usb"):
 
     async def flush_in_endpoint(self) -> None:
         assert self.dev is not None, "Not connected"
+        loop = asyncio.get_running_loop()
 
+        # Clearing a halt wouldn't discard data the device has already
+        # queued, so read until the endpoint goes quiet.
         while True:
             try:
-                _data = await self.loop.run_in_executor(
-                    None, self.dev.read, self.in_ep, self.max_packet_size, 50
+                _data = await loop.run_in_executor(
+                    None, self.dev.read, self.in_ep, FLUSH_READ_SIZE, 50
                 )
             except usb.core.USBError as e:
                 if hasattr(e, "errno") and e.errno == errno.ETIMEDOUT:
                     break
                 else:
-                    logger.error(f"Error while flushing IN endpoint: {e}")
+                    logger.error("Error while flushing IN endpoint: %s", e)
                     raise
 
     async def _background_reader(self) -> None:
         # Task to always have a read pending on the IN endpoint
+        loop = asyncio.get_running_loop()
         buf = bytearray()
         while self.dev is not None:
             try:
-                data = await self.loop.run_in_executor(
+                data = await loop.run_in_executor(
                     None, self.dev.read, self.in_ep, self.max_packet_size, 0
                 )
                 buf.extend(data)
-                logger.debug(f"Received raw data: {data}")
+                logger.debug("Received raw data: %s", data)
 
                 while True:
-                    if len(buf) < 2:
+                    if len(buf) < LENGTH_PREFIX.size:
                         break  # need more data
 
-                    msg_length = struct.unpack(">H", buf[:2])[0]
-                    total_length = 2 + msg_length
+                    (msg_length,) = LENGTH_PREFIX.unpack_from(buf)
+                    total_length = LENGTH_PREFIX.size + msg_length
 
                     if len(buf) < total_length:
                         break  # need more data
 
-                    # Pass on the CBOR payload
-                    msg = bytes(buf[2:total_length])
-                    buf = buf[total_length:]
-                    logger.debug(f"Received payload: {msg}")
+                    # Pass on the CBOR payload. Deleting from the front of a
+                    # bytearray doesn't copy the data that remains.
+                    msg = bytes(buf[LENGTH_PREFIX.size : total_length])
+                    del buf[:total_length]
+                    logger.debug("Received payload: %s", msg)
                     await self.receive_queue.put(msg)
 
             except usb.core.USBError as e:
-                logger.error(f"USB Error while receiving: {e}")
+                logger.error("USB Error while receiving: %s", e)
                 await self.close()
                 break
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Unexpected error in background reader: {e}")
+                logger.error("Unexpected error in background reader: %s", e)
                 await self.close()
                 break
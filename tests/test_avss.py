@@ -1,7 +1,30 @@
+import asyncio
+import struct
+
+import cbor2
+import pytest
+
+from anura.avss import (
+    AVSSBadArgumentError,
+    AVSSConnectionError,
+    AVSSControlPointError,
+    OpCode,
+    ReportType,
+    ResponseCode,
+)
+from anura.avss.client import (
+    SEGMENT_FIRST,
+    SEGMENT_LAST,
+    AVSSClient,
+    Report,
+)
 from anura.avss.models import (
+    CaptureReport,
     HealthReport,
     SnippetReport,
 )
+from anura.avss.settings import SettingsMapper
+from anura.avss.transport.base import AVSSTransport
 from anura.marshalling import unmarshal
 
 
@@ -37,6 +60,21 @@ def test_unmarshal_SnippetReport_without_timing():
     assert report.transmission_offset is None
 
 
+def test_unmarshal_CaptureReport_without_timing():
+    # Pre-v26.4.0 firmware omits the timing fields (keys 5-8).
+    report = unmarshal(
+        CaptureReport,
+        {
+            0: 0,
+            2: 16,
+            3: {0: b""},
+            4: True,
+        },
+    )
+    assert report.duration is None
+    assert report.duration_monotonic is None
+
+
 def test_unmarshal_SnippetReport_with_timing():
     # v26.4.0+ firmware adds keys 5-8.
     report = unmarshal(
@@ -55,3 +93,333 @@ def test_unmarshal_SnippetReport_with_timing():
     )
     assert report.duration == 5
     assert report.transmission_offset == 8
+
+
+class FakeTransport(AVSSTransport):
+    """In-memory transport that records writes and exposes the callbacks."""
+
+    def __init__(self):
+        self.report_callback = None
+        self.program_callback = None
+        self.closed_callback = None
+        self.program_writes: list[bytes] = []
+        self.requests: list[bytes] = []
+        self.responses: list[bytes] = []
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        if self.closed_callback:
+            self.closed_callback()
+
+    async def control_point_request(self, req: bytes) -> bytes:
+        self.requests.append(bytes(req))
+        return self.responses.pop(0)
+
+    async def program_write(self, value: bytes) -> None:
+        self.program_writes.append(bytes(value))
+
+    def set_report_callback(self, callback) -> None:
+        self.report_callback = callback
+
+    def set_program_callback(self, callback) -> None:
+        self.program_callback = callback
+
+    def set_closed_callback(self, callback) -> None:
+        self.closed_callback = callback
+
+
+def _segments(record: bytes, size: int) -> list[bytes]:
+    """Split a report record into segments as sent by a node."""
+    chunks = [record[i : i + size] for i in range(0, len(record), size)]
+    segments = []
+    for number, chunk in enumerate(chunks):
+        hdr = number & 0x3F
+        if number == 0:
+            hdr |= SEGMENT_FIRST
+        if number == len(chunks) - 1:
+            hdr |= SEGMENT_LAST
+        segments.append(bytes((hdr,)) + chunk)
+    return segments
+
+
+async def _receive_reports(segments: list[bytes]) -> list[Report]:
+    """Feed segments to a client and return the reports it yields."""
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    received: list[Report] = []
+
+    with client.reports(parse=False) as reports:
+        for segment in segments:
+            transport.report_callback(segment)
+        await transport.close()
+
+        with pytest.raises(AVSSConnectionError):
+            async for report in reports:
+                received.append(report)
+
+    return received
+
+
+def test_report_reassembly():
+    record = bytes((4,)) + bytes(range(256)) * 3
+    received = asyncio.run(_receive_reports(_segments(record, 100)))
+
+    assert len(received) == 1
+    assert received[0].report_type == 4
+    assert received[0].payload_cbor == record[1:]
+    assert received[0]._transfer_info is not None
+    assert received[0]._transfer_info.num_bytes == len(record)
+    assert received[0]._transfer_info.num_segments == 8
+
+
+def test_consecutive_reports_are_independent():
+    # Segments of one report must not end up in another.
+    first = bytes((4,)) + bytes(range(200))
+    second = bytes((1,)) + bytes(50)
+    received = asyncio.run(
+        _receive_reports(_segments(first, 64) + _segments(second, 64))
+    )
+
+    assert [r.payload_cbor for r in received] == [first[1:], second[1:]]
+    assert received[1]._transfer_info is not None
+    assert received[1]._transfer_info.num_segments == 1
+
+
+def test_report_reassembly_large():
+    record = bytes((2,)) + bytes(range(251)) * 1000
+    received = asyncio.run(_receive_reports(_segments(record, 4000)))
+
+    assert len(received) == 1
+    assert received[0].payload_cbor == record[1:]
+
+
+def test_report_out_of_sequence_segment_is_dropped():
+    segments = _segments(bytes((4,)) + bytes(300), 100)
+    del segments[1]
+    received = asyncio.run(_receive_reports(segments))
+
+    assert received == []
+
+
+def test_empty_report_is_dropped():
+    empty = bytes((SEGMENT_FIRST | SEGMENT_LAST,))
+    record = bytes((4,)) + bytes(10)
+    received = asyncio.run(_receive_reports([empty, *_segments(record, 64)]))
+
+    assert [r.payload_cbor for r in received] == [record[1:]]
+
+
+def test_reports_after_disconnection():
+    async def receive():
+        transport = FakeTransport()
+        client = AVSSClient(transport)
+        await transport.close()
+
+        with client.reports() as reports:
+            await anext(reports)
+
+    with pytest.raises(AVSSConnectionError):
+        asyncio.run(receive())
+
+
+def _ok_response(opcode: OpCode) -> bytes:
+    return bytes((OpCode.RESPONSE, opcode, ResponseCode.OK))
+
+
+def test_report_parse():
+    payload = cbor2.dumps({0: 1, 1: 2, 2: 3, 3: 21.5, 4: 3300, 5: -60, 6: 0})
+    report = Report(ReportType.HEALTH, payload).parse()
+    assert isinstance(report, HealthReport)
+    assert report.temperature == 21.5
+
+    assert Report(0xFF, payload).parse() is None
+
+
+def test_request_without_argument():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    transport.responses.append(_ok_response(OpCode.REBOOT))
+
+    asyncio.run(client.reboot())
+
+    assert transport.requests == [bytes((OpCode.REBOOT,)) + cbor2.dumps(None)]
+
+
+def test_request_with_argument():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    transport.responses.append(_ok_response(OpCode.REPORT_SNIPPETS))
+
+    asyncio.run(client.report_snippets(count=3, auto_resume=True))
+
+    assert transport.requests == [
+        bytes((OpCode.REPORT_SNIPPETS,)) + cbor2.dumps({0: 3, 1: True})
+    ]
+
+
+def test_request_error_response():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    transport.responses.append(
+        bytes((OpCode.RESPONSE, OpCode.REPORT_SNIPPETS, ResponseCode.BAD_ARGUMENT))
+    )
+
+    with pytest.raises(AVSSBadArgumentError):
+        asyncio.run(client.report_snippets(count=3, auto_resume=True))
+
+
+def test_control_point_error_from_unknown_response_code():
+    error = AVSSControlPointError.from_response(200, opcode=OpCode.REBOOT)
+
+    assert type(error) is AVSSControlPointError
+    assert error.response_code == 200
+
+
+def test_get_version():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    transport.responses.append(
+        bytes((OpCode.GET_VERSION_RESPONSE,)) + cbor2.dumps({0: "v1.2.3", 1: "abc"})
+    )
+
+    version = asyncio.run(client.get_version())
+
+    assert version.version == "v1.2.3"
+    assert version.build_version == "abc"
+
+
+def _apply_program_writes(writes: list[bytes]) -> bytes:
+    """Reconstruct the image a node would end up with from program writes."""
+    image = bytearray()
+    for write in writes:
+        offset = int.from_bytes(write[:4], "little")
+        image[offset : offset + len(write) - 4] = write[4:]
+    return bytes(image)
+
+
+def test_program_transfer():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    binary = bytes(range(256)) * 4
+    progress: list[int] = []
+
+    asyncio.run(client.program_transfer(binary, att_mtu=23, progress=progress.append))
+
+    assert _apply_program_writes(transport.program_writes) == binary
+    assert all(len(write) <= 23 - 3 for write in transport.program_writes)
+    assert progress[-1] == len(binary)
+
+
+def test_program_transfer_uses_transport_write_size():
+    transport = FakeTransport()
+    transport.max_program_write_size = lambda: 100
+    client = AVSSClient(transport)
+    binary = bytes(range(256)) * 4
+
+    asyncio.run(client.program_transfer(binary))
+
+    assert _apply_program_writes(transport.program_writes) == binary
+    assert max(len(write) for write in transport.program_writes) == 100
+
+
+def test_program_transfer_resynchronizes_on_nack():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    binary = bytes(range(256)) * 4
+
+    async def program_write(value: bytes) -> None:
+        transport.program_writes.append(bytes(value))
+        if len(transport.program_writes) == 5:
+            # Node lost the third chunk and asks for it again.
+            transport.program_callback(struct.pack("<L", 32))
+
+    transport.program_write = program_write
+
+    asyncio.run(client.program_transfer(binary, att_mtu=23))
+
+    offsets = [int.from_bytes(w[:4], "little") for w in transport.program_writes]
+    assert offsets[:5] == [0, 16, 32, 48, 64]
+    # Writes already in flight complete, then the transfer resumes at the
+    # offset requested by the node.
+    resumed = offsets.index(32, 5)
+    assert offsets[resumed : resumed + 2] == [32, 48]
+    assert _apply_program_writes(transport.program_writes) == binary
+
+
+def test_program_transfer_nack_after_last_write():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    binary = bytes(range(256)) * 4
+    lost = [992]
+
+    async def program_write(value: bytes) -> None:
+        offset = int.from_bytes(value[:4], "little")
+        if offset in lost:
+            # Node loses the second to last chunk and only NACKs it once the
+            # final chunk has come in.
+            lost.remove(offset)
+            return
+        transport.program_writes.append(bytes(value))
+        if offset == 1008 and len(transport.program_writes) == 63:
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, transport.program_callback, struct.pack("<L", 992))
+
+    transport.program_write = program_write
+
+    asyncio.run(client.program_transfer(binary, att_mtu=23))
+
+    assert _apply_program_writes(transport.program_writes) == binary
+
+
+def test_program_transfer_aborted():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+
+    async def program_write(value: bytes) -> None:
+        transport.program_callback(b"\xff\xff\xff\xff")
+
+    transport.program_write = program_write
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.program_transfer(bytes(1000), att_mtu=23))
+
+
+def test_program_transfer_aborted_with_writes_in_flight():
+    transport = FakeTransport()
+    client = AVSSClient(transport)
+    writes: list[asyncio.Task] = []
+
+    async def program_write(value: bytes) -> None:
+        writes.append(asyncio.current_task())
+        if len(writes) == 2:
+            transport.program_callback(b"\xff\xff\xff\xff")
+        # Writes after the first never complete on their own.
+        await asyncio.sleep(0.01 if len(writes) == 1 else 10)
+
+    transport.program_write = program_write
+
+    async def transfer():
+        with pytest.raises(RuntimeError):
+            await client.program_transfer(bytes(1000), att_mtu=23, max_inflight=4)
+        # The writes still in flight were cancelled and have finished.
+        assert len(writes) == 4
+        assert all(task.done() for task in writes)
+
+    asyncio.run(transfer())
+
+
+def test_settings_mapper():
+    readable = {"snippet_length": 16, "99": 1, 42: 2}
+    mapped = SettingsMapper.from_readable(readable)
+
+    assert mapped == {2: 16, 99: 1, 42: 2}
+    assert SettingsMapper.to_readable(mapped) == {
+        "snippet_length": 16,
+        "99": 1,
+        "42": 2,
+    }
+
+    with pytest.raises(ValueError):
+        SettingsMapper.from_readable({"no_such_setting": 1})
@@ -1,9 +1,10 @@
+import ipaddress
 from dataclasses import dataclass
 from typing import Annotated
 
 import pytest
 
-from anura.marshalling import CborKey, unmarshal
+from anura.marshalling import CborKey, marshal, unmarshal
 
 
 def test_unmarshal_dataclass_unknown_key():
@@ -94,3 +95,34 @@ def test_unmarshal_dataclass_recursive():
     outer = unmarshal(OuterClass, {0: {0: 1}})
 
     assert isinstance(outer.inner, InnerClass)
+
+
+@dataclass
+class _TreeNode:
+    value: Annotated[int, CborKey(0)]
+    children: Annotated[list["_TreeNode"], CborKey(1)]
+
+
+def test_unmarshal_dataclass_self_referencing():
+    tree = unmarshal(_TreeNode, {0: 1, 1: [{0: 2, 1: []}, {0: 3, 1: [{0: 4, 1: []}]}]})
+
+    assert [child.value for child in tree.children] == [2, 3]
+    assert tree.children[1].children[0].value == 4
+
+
+def test_marshal_roundtrip():
+    @dataclass
+    class Inner:
+        addr: Annotated[ipaddress.IPv4Address, CborKey(0)]
+
+    @dataclass
+    class Outer:
+        items: Annotated[list[Inner], CborKey(1)]
+        extra: Annotated[dict[int, str], CborKey(0)]
+
+    outer = Outer(items=[Inner(ipaddress.IPv4Address("10.0.0.1"))], extra={1: "a"})
+    struct = marshal(outer)
+
+    assert struct[0] == {1: "a"}
+    assert struct[1][0][0].tag == 52
+    assert unmarshal(Outer, struct) == outer
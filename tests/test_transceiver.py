@@ -0,0 +1,137 @@
+import asyncio
+import errno
+import threading
+
+import pytest
+
+from anura.transceiver.client import TransceiverClient
+from anura.transceiver.exceptions import TransceiverConnectionError, TransceiverError
+from anura.transceiver.models import UnknownNotification
+
+
+class FakeDfuClient(TransceiverClient):
+    """Records dfu_write calls instead of sending them."""
+
+    def __init__(self):
+        super().__init__("localhost")
+        self.writes: list[tuple[int, bytes]] = []
+        self.max_pending = 0
+        self._pending = 0
+
+    async def dfu_write(self, offset: int, data: bytes):
+        self._pending += 1
+        self.max_pending = max(self.max_pending, self._pending)
+        await asyncio.sleep(0)
+        self._pending -= 1
+        self.writes.append((offset, data))
+
+
+@pytest.mark.parametrize("max_inflight", [1, 4])
+def test_dfu_write_image(max_inflight):
+    client = FakeDfuClient()
+    image = bytes(range(256)) * 4
+    progress: list[int] = []
+
+    asyncio.run(
+        client.dfu_write_image(
+            image, chunk_size=100, progress=progress.append, max_inflight=max_inflight
+        )
+    )
+
+    assert [offset for offset, _ in client.writes] == list(range(0, 1024, 100))
+    assert b"".join(data for _, data in client.writes) == image
+    assert progress == [*range(100, 1024, 100), 1024]
+    assert client.max_pending == max_inflight
+
+
+def test_notifications_end_on_disconnection():
+    client = TransceiverClient("localhost")
+
+    async def connection_lost():
+        await asyncio.sleep(0)
+        raise TransceiverError("Transport read failed")
+
+    async def receive():
+        received = []
+        with client.notifications() as notifications:
+            for callback in client._notification_callbacks:
+                callback(UnknownNotification("first", None))
+                callback(UnknownNotification("second", None))
+
+            # Same wiring as connect()
+            client._connection_task = asyncio.create_task(connection_lost())
+            client._connection_task.add_done_callback(client._on_disconnected)
+
+            with pytest.raises(TransceiverConnectionError):
+                async for notification in notifications:
+                    received.append(notification.notification_type)
+        return received
+
+    assert asyncio.run(receive()) == ["first", "second"]
+
+
+class FakeUSBDevice:
+    """Stands in for a pyusb device; writes block until released."""
+
+    def __init__(self, usb_core):
+        self._usb_core = usb_core
+        self.disposed = threading.Event()
+        self.write_started = threading.Event()
+        self.release_writes = threading.Event()
+        self.writes: list[bytes] = []
+
+    def set_configuration(self):
+        pass
+
+    def is_kernel_driver_active(self, interface):
+        return False
+
+    def read(self, endpoint, size, timeout):
+        if timeout:
+            # Nothing left to flush
+            raise self._usb_core.USBError("Timeout", errno=errno.ETIMEDOUT)
+        self.disposed.wait()
+        raise self._usb_core.USBError("No such device", errno=errno.ENODEV)
+
+    def write(self, endpoint, data, timeout):
+        self.write_started.set()
+        self.release_writes.wait()
+        self.writes.append(bytes(data))
+
+
+def test_usb_send_fails_when_closed_while_queued(monkeypatch):
+    usb_transport = pytest.importorskip("anura.transceiver.transport.usb")
+    device = FakeUSBDevice(usb_transport.usb.core)
+    monkeypatch.setattr(usb_transport.usb.util, "release_interface", lambda *_: None)
+    monkeypatch.setattr(
+        usb_transport.usb.util, "dispose_resources", lambda _: device.disposed.set()
+    )
+
+    async def send_while_closing():
+        transport = usb_transport.USBTransport("0", None)
+        transport._find_device_by_serial = lambda _: device
+        await transport.open_connection()
+
+        first = asyncio.create_task(transport.send(b"first"))
+        second = asyncio.create_task(transport.send(b"second"))
+        await asyncio.to_thread(device.write_started.wait)
+
+        await transport.close()
+        device.release_writes.set()
+
+        await first
+        with pytest.raises(ConnectionError):
+            await second
+
+        # The transport can be connected again after being closed.
+        device.disposed.clear()
+        try:
+            await transport.open_connection()
+            await transport.send(b"third")
+            await transport.close()
+        finally:
+            device.disposed.set()  # don't leave the reader thread blocked
+
+    asyncio.run(send_while_closing())
+
+    assert device.writes == [b"\x00\x05first", b"\x00\x05third"]